@@ -7,3 +7,14 @@ class MySQLConfig(ConfigModel):
     port: int = 0
     db: str = ""
 
+
+class SnapshotConfig(ConfigModel):
+    enabled: bool = False
+    dir: str = "SNAPSHOT_ARCHIVE"
+    level: int = 10
+    workers: int = 0  # 0이면 CPU 개수만큼
+
+class BlogConfig(ConfigModel):
+    top_n: int = 3  # 가게당 수집할 블로그 글 수
+    concurrency: int = 2  # 동시에 여는 블로그 페이지 수
+    revalidate_days: int = 7  # 캐시된 글을 이 기간이 지나면 ETag/Last-Modified로 재검증
@@ -4,22 +4,53 @@ import random
 from playwright.async_api import async_playwright
 import time
 import os
+import hashlib
+from datetime import datetime, timedelta
 import aiohttp
 import aiofiles
 from models.db_manager import DBManager
-from models.DTOs import HomeDataDTO, ReviewDataDTO, BlogDataDTO, PhotoDataDTO
+from models.DTOs import HomeDataDTO, ReviewDataDTO, BlogDataDTO, BlogListDTO, PhotoDataDTO
+from configs.config import Configs
+from configs.config_model import SnapshotConfig, BlogConfig
+from utils.snapshot import SnapshotArchive
+from utils.parsers import (
+    parse_review_text, parse_blog_html,
+    ADDRESS_SELECTOR, BUSINESS_HOURS_SELECTOR, HOURS_ROW_SELECTOR, HOURS_DAY_SELECTOR, HOURS_TIME_SELECTOR,
+    BLOG_LINK_SELECTOR, BLOG_TITLE_SELECTOR, BLOG_AUTHOR_SELECTOR, BLOG_DATE_SELECTOR, BLOG_CONTENT_SELECTOR, BLOG_IMAGE_SELECTOR
+)
 from utils.logger import Logger
 logger = Logger()
 
+CONFIG_PATH = "configs/config.toml"
+
 BLOG_SAVE_DIR = "BLOG_IMG_DOWNLOAD"
 
 TAB_PHOTO_SAVE_DIR = "TAB_PHOTO_IMG_DOWNLOAD"
 
 
 class NaverMapMetaCrawler:
-    def __init__(self, headless=True, db_manager: DBManager = None):
+    def __init__(self, headless=True, db_manager: DBManager = None, snapshot: SnapshotArchive = None, blog_config: BlogConfig = None):
         self.headless = headless
         self.db_manager: DBManager = db_manager
+        self.snapshot: SnapshotArchive = snapshot
+        self.blog_config: BlogConfig = blog_config or BlogConfig()
+        self.capture = None
+
+    def _record(self, key, value):
+        # 스냅샷 모드일 때만 원본 데이터를 모아둔다
+        if self.capture is not None:
+            self.capture[key] = value
+
+    async def _capture_response(self, response):
+        try:
+            if "json" not in response.headers.get("content-type", ""):
+                return
+            body = await response.text()
+            self.capture.setdefault("responses", []).append(
+                {"url": response.url, "status": response.status, "body": body}
+            )
+        except Exception as e:
+            logger.warning(f"Response Capture Failed: {response.url} {str(e)}")
 
     async def download_random_images(self, image_list, download_path=BLOG_SAVE_DIR):
         try:
@@ -38,6 +69,11 @@ class NaverMapMetaCrawler:
         except Exception as e:
             logger.error(f"Image Download Failed: {str(e)}")
 
+    async def download_blog_images(self, blog_url, image_list):
+        # 랜덤으로 2개 찍어서 로컬에 다운로드. (글마다 폴더를 나눠 동시 수집 시 덮어쓰지 않게)
+        download_path = os.path.join(BLOG_SAVE_DIR, hashlib.sha256(blog_url.encode("utf-8")).hexdigest()[:12])
+        await self.download_random_images(image_list, download_path)
+
     async def crawl(self, store_name):
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=self.headless)
@@ -48,6 +84,9 @@ class NaverMapMetaCrawler:
                 timezone_id="Asia/Seoul"
             )
             page = await context.new_page()
+            if self.snapshot:
+                self.capture = {}
+                page.on("response", self._capture_response)
             await page.goto("https://map.naver.com/v5/")
             await page.wait_for_timeout(2000)
 
@@ -68,14 +107,19 @@ class NaverMapMetaCrawler:
             entry_iframe = await page.query_selector("iframe#entryIframe")
             entry = await entry_iframe.content_frame()
 
-            home_data_raw = await self.fetch_home(entry, store_name)
-            home_data = HomeDataDTO(**home_data_raw)
-            review_data_raw = await self.fetch_reviews(entry)
-            review_data = ReviewDataDTO(**review_data_raw)
-            blog_data_raw = await self.fetch_blog(entry)
-            blog_data = BlogDataDTO(**blog_data_raw)
-            photo_data_raw = await self.fetch_photos(entry)
-            photo_data = PhotoDataDTO(**photo_data_raw)
+            try:
+                home_data_raw = await self.fetch_home(entry, store_name)
+                home_data = HomeDataDTO(**home_data_raw)
+                review_data_raw = await self.fetch_reviews(entry)
+                review_data = ReviewDataDTO(**review_data_raw)
+                blog_data_raw = await self.fetch_blog(entry)
+                blog_data = BlogListDTO(**blog_data_raw)
+                photo_data_raw = await self.fetch_photos(entry)
+                photo_data = PhotoDataDTO(**photo_data_raw)
+            finally:
+                # 셀렉터 변경 등으로 파싱이 실패해도 수집한 원본은 남겨서 나중에 reparse 할 수 있게 한다
+                if self.capture:
+                    self.snapshot.save_manifest(store_name, self.capture)
 
 
             # self.db_manager.add_place_with_all(home_data, review_data, blog_data, photo_data)
@@ -93,14 +137,17 @@ class NaverMapMetaCrawler:
             return result
 
     async def fetch_home(self, entry, name):
+        if self.capture is not None:
+            self._record("entry_html", await entry.content())
+
         # 2. 도로명 주소 span 찾기
-        await entry.wait_for_selector("span.LDgIH", timeout=5000)
-        road_name_elem = await entry.query_selector("span.LDgIH")
+        await entry.wait_for_selector(ADDRESS_SELECTOR, timeout=5000)
+        road_name_elem = await entry.query_selector(ADDRESS_SELECTOR)
         address = (await road_name_elem.text_content()).strip()
 
         # 3. 영업 시간 span 찾기
-        await entry.wait_for_selector("span.U7pYf", timeout=5000)
-        business_hours_elem = await entry.query_selector("span.U7pYf")
+        await entry.wait_for_selector(BUSINESS_HOURS_SELECTOR, timeout=5000)
+        business_hours_elem = await entry.query_selector(BUSINESS_HOURS_SELECTOR)
         business_hours = (await business_hours_elem.text_content()).strip()
         
         # 2. '펼쳐보기' 버튼 클릭 (있을 때만)
@@ -110,14 +157,16 @@ class NaverMapMetaCrawler:
             await expand_btn.click()
             time.sleep(1)
 
-        await entry.wait_for_selector("div.w9QyJ", timeout=5000)
-        day_divs = await entry.query_selector_all("div.w9QyJ")
+        await entry.wait_for_selector(HOURS_ROW_SELECTOR, timeout=5000)
+        day_divs = await entry.query_selector_all(HOURS_ROW_SELECTOR)
+        if self.capture is not None:
+            self._record("entry_html", await entry.content())  # 펼쳐보기 이후 HTML로 갱신
 
         hours = []
         for div in day_divs:
             # 요일 추출
-            day_elem = await div.query_selector("span.A_cdD span.i8cJw")
-            time_elem = await div.query_selector("div.H3ua4")
+            day_elem = await div.query_selector(HOURS_DAY_SELECTOR)
+            time_elem = await div.query_selector(HOURS_TIME_SELECTOR)
             # 시간 추출
             if day_elem and time_elem:
                 day = (await day_elem.text_content()).strip()
@@ -147,6 +196,7 @@ class NaverMapMetaCrawler:
         for r in review_elements[:4]:  # 상위 4개만
             text = (await r.inner_text())
             reviews.append(text.strip())
+        self._record("review_texts", reviews)
 
         parsed_review_list = []
         for review in reviews:
@@ -176,17 +226,101 @@ class NaverMapMetaCrawler:
                 break
         await entry.wait_for_timeout(2000)
 
-        # 블로그 첫 번째 링크 가져오기
-        first_blog = await entry.query_selector("ul li.EblIP a")
-        blog_url = await first_blog.get_attribute("href")
+        # 블로그 상위 N개 링크 가져오기
+        blog_urls = []
+        for link in await entry.query_selector_all(BLOG_LINK_SELECTOR):
+            href = await link.get_attribute("href")
+            if href and href not in blog_urls:
+                blog_urls.append(href)
+            if len(blog_urls) >= self.blog_config.top_n:
+                break
+        self._record("blog_urls", blog_urls)
+
+        # 다른 가게/이전 실행에서 이미 수집한 글은 캐시에서 재사용
+        cached_posts = await self.db_manager.get_cached_blog_posts(blog_urls)
+        semaphore = asyncio.Semaphore(self.blog_config.concurrency)
+
+        async def harvest(url):
+            async with semaphore:
+                cached = cached_posts.get(url)
+                if cached:
+                    expire_at = (cached.fetched_at or datetime.min) + timedelta(days=self.blog_config.revalidate_days)
+                    if datetime.now() < expire_at:
+                        return cached.model_dump()
+                    revalidated = await self.revalidate_blog(cached)
+                    if revalidated:
+                        return revalidated
+
+                blog_data = await self.fetch_blog_contents(url, entry)
+                blog_data.update({"blog_url": url})
+                return blog_data
+
+        results = await asyncio.gather(*(harvest(url) for url in blog_urls), return_exceptions=True)
+        blogs = []
+        for url, result in zip(blog_urls, results):
+            if isinstance(result, Exception):
+                logger.error(f"Blog Fetch Failed: {url} {str(result)}")
+                continue
+            blogs.append(result)
+
+        return {"blogs": blogs}
+
+    async def revalidate_blog(self, cached: BlogDataDTO):
+        """
+        캐시된 글을 ETag/Last-Modified 조건부 요청으로 확인합니다.
+        304면 캐시를 그대로 쓰고, 200이면 받은 HTML을 바로 파싱합니다. 확인할 수 없으면 None.
+        """
+        if not cached.frame_url or not (cached.etag or cached.last_modified):
+            return None
+
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
 
-        blog_data = await self.fetch_blog_contents(blog_url, entry)
-        blog_data.update({"blog_url": blog_url})
-        
-        return blog_data
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(cached.frame_url, headers=headers) as resp:
+                    if resp.status == 304:
+                        logger.info(f"Blog Not Modified: {cached.blog_url}")
+                        return cached.model_copy(update={"fetched_at": datetime.now()}).model_dump()
+                    if resp.status != 200:
+                        return None
+                    html = await resp.text()
+                    blog_data = parse_blog_html(html)
+                    blog_data.update({
+                        "blog_url": cached.blog_url,
+                        "frame_url": cached.frame_url,
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "fetched_at": datetime.now(),
+                        "content_fetched_at": datetime.now()
+                    })
+                    if self.capture is not None:
+                        self.capture.setdefault("blogs", []).append({"url": cached.blog_url, "html": html})
+                    await self.download_blog_images(cached.blog_url, blog_data["images"])
+                    return blog_data
+        except Exception as e:
+            logger.warning(f"Blog Revalidation Failed: {cached.blog_url} {str(e)}")
+            return None
 
     async def fetch_blog_contents(self, url, entry):
         page = await entry.page.context.new_page()
+        try:
+            return await self._fetch_blog_page(page, url)
+        finally:
+            await page.close()
+
+    async def _fetch_blog_page(self, page, url):
+        # mainFrame 문서 응답의 캐시 검증 헤더를 기록
+        frame_headers = {}
+
+        def on_response(response):
+            if response.request.is_navigation_request() and response.frame.name == "mainFrame":
+                frame_headers.update(response.headers)
+
+        page.on("response", on_response)
         await page.goto(url)
         await page.wait_for_timeout(3000)  # 페이지 로딩 대기
 
@@ -194,23 +328,23 @@ class NaverMapMetaCrawler:
         frame_locator =page.frame_locator("iframe#mainFrame")
         blog_frame = frame_locator.first
 
-        title = blog_frame.locator(".se-module.se-module-text.se-title-text").first
+        title = blog_frame.locator(BLOG_TITLE_SELECTOR).first
         blog_title = (await title.text_content()).strip()
 
-        author = blog_frame.locator(".link.pcol2").first
+        author = blog_frame.locator(BLOG_AUTHOR_SELECTOR).first
         nickname = (await author.text_content()).strip()
 
-        date = blog_frame.locator(".se_publishDate.pcol2").first
-        datetime = (await date.text_content()).strip()
+        date = blog_frame.locator(BLOG_DATE_SELECTOR).first
+        blog_date = (await date.text_content()).strip()
 
-        contents = await blog_frame.locator(".se-component.se-text.se-l-default").all()
+        contents = await blog_frame.locator(BLOG_CONTENT_SELECTOR).all()
         sum_contents = ""
         for content in contents:
             clean_content = (await content.text_content()).replace("\u200b", "").strip()
             sum_contents += clean_content
 
 
-        image_elements = await blog_frame.locator("div.se-component.se-image.se-l-default.__se-component img").all()
+        image_elements = await blog_frame.locator(BLOG_IMAGE_SELECTOR).all()
         image_list = []
         
         for element in image_elements:
@@ -218,14 +352,23 @@ class NaverMapMetaCrawler:
             if src:
                 image_list.append(src)
 
-        await self.download_random_images(image_list, BLOG_SAVE_DIR) # 랜덤으로 2개 찍어서 로컬에 다운로드.
+        main_frame = await (await page.query_selector("iframe#mainFrame")).content_frame()
+        if self.capture is not None:
+            self.capture.setdefault("blogs", []).append({"url": url, "html": await main_frame.content()})
+
+        await self.download_blog_images(url, image_list)
         
         blog_data = {
             "title": blog_title,
             "author": nickname,
-            "date": datetime,
+            "date": blog_date,
             "content": sum_contents,
-            "images": image_list
+            "images": image_list,
+            "frame_url": main_frame.url,
+            "etag": frame_headers.get("etag"),
+            "last_modified": frame_headers.get("last-modified"),
+            "fetched_at": datetime.now(),
+            "content_fetched_at": datetime.now()
         }
 
         return blog_data
@@ -282,6 +425,7 @@ class NaverMapMetaCrawler:
             photo_data = {
                 "images": large_images[:3]
             }
+            self._record("photos", large_images[:3])
 
 
             return photo_data
@@ -291,76 +435,18 @@ class NaverMapMetaCrawler:
 
         pass
 
-async def parse_review_text(review_text: str) -> dict:
-    """
-    네이버 리뷰 원본 텍스트를 의미별로 파싱해 딕셔너리로 반환합니다.
-    """
-    import re
-    lines = [line for line in review_text.split('\n') if line.strip()]
-
-    # 1. 작성자
-    author = lines[0] if len(lines) > 0 else None
-
-    # 2. 프로필 정보
-    profile_match = re.search(r'리뷰 (\d+)사진 (\d+)팔로워 (\d+)', lines[1]) if len(lines) > 1 else None
-    profile = {
-        "review": int(profile_match.group(1)) if profile_match else None,
-        "photo": int(profile_match.group(2)) if profile_match else None,
-        "follower": int(profile_match.group(3)) if profile_match else None,
-    }
-
-    # 3. 팔로우 여부
-    follow = any("follow" in l for l in lines[:4])
-
-    # 4. 방문정보
-    visit_info = None
-    for l in lines[2:6]:
-        if any(x in l for x in ["방문", "예약", "대기", "입장", "일상", "지인", "동료"]):
-            visit_info = l
-            break
-
-    # 5. 본문(리뷰 내용)
-    body_lines = []
-    for line in lines[4:]:
-        if "더보기" in line:
-            break
-        body_lines.append(line)
-    body = " ".join(body_lines)
-
-    # 6. 태그
-    tag_line = next((l for l in lines if "+" in l or "음식이 맛있어요" in l), None)
-    tags = []
-    if tag_line:
-        tags = re.findall(r"[가-힣A-Za-z0-9\s]+", tag_line)
-        tags = [t.strip() for t in tags if t.strip() and t.strip() != "+4"]
-
-    # 7. 추가 리뷰 안내
-    extra_review_line = next((l for l in lines if "개의 리뷰가 더 있습니다" in l), None)
-
-    # 8. 방문일, 방문차수, 인증수단
-    visit_date = next((l for l in lines if re.match(r"\d{4}년", l)), None)
-    visit_count = next((l for l in lines if "번째 방문" in l), None)
-    receipt = next((l for l in lines if "영수증" in l or "인증" in l), None)
-
-    return {
-        "author": author,
-        "profile": profile,
-        "follow": follow,
-        "visit_info": visit_info,
-        "body": body,
-        "tags": tags,
-        "review_more": any("더보기" in l for l in lines),
-        "extra_review_line": extra_review_line,
-        "visit_date": visit_date,
-        "visit_count": visit_count,
-        "receipt": receipt
-    }
-
-async def main(store_name):
+async def main(store_name, snapshot=False):
+    configs = Configs(CONFIG_PATH)
+    snapshot_config = configs.get(SnapshotConfig) or SnapshotConfig()
+    blog_config = configs.get(BlogConfig) or BlogConfig()
+    archive = None
+    if snapshot or snapshot_config.enabled:
+        archive = SnapshotArchive(snapshot_config.dir, snapshot_config.level)
+
     db = DBManager()
     try:
         await db.create_all_tables()
-        crawler = NaverMapMetaCrawler(headless=False, db_manager=db)
+        crawler = NaverMapMetaCrawler(headless=False, db_manager=db, snapshot=archive, blog_config=blog_config)
         await crawler.crawl(store_name)
     finally:
         await db.aclose()
@@ -368,6 +454,7 @@ async def main(store_name):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Naver Map Meta Crawler")
     parser.add_argument("store_name", type=str, help="Name of the store to crawl")
+    parser.add_argument("--snapshot", action="store_true", help="Save raw HTML/JSON to the snapshot archive for offline reparse")
     args = parser.parse_args()
 
-    asyncio.run(main(args.store_name))
+    asyncio.run(main(args.store_name, args.snapshot))
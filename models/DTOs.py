@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 
 class PlaceHoursDTO(BaseModel):
     day: str
@@ -39,6 +40,15 @@ class BlogDataDTO(BaseModel):
     content: str
     blog_url: str
     images: List[str]
+    frame_url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: Optional[datetime] = None
+    content_fetched_at: Optional[datetime] = None
+    cached: bool = False  # True면 blog_post 캐시에서 재사용한 글 (본문 갱신 없음)
+
+class BlogListDTO(BaseModel):
+    blogs: List[BlogDataDTO]
 
 class PhotoDataDTO(BaseModel):
     images: List[str]
\ No newline at end of file
@@ -1,21 +1,35 @@
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import (
-    sessionmaker, scoped_session
+    sessionmaker, scoped_session, selectinload
 )
 from contextlib import contextmanager
+from sqlalchemy import select, delete, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from models.models import (
-    Base, Place, PlaceHours, Review, Blog, BlogImage, PlacePhoto
+    Base, Place, PlaceHours, PlaceOpenInterval, Review, Tag, ReviewTag, Blog, BlogPost, BlogImage, PlacePhoto
 )
 from configs.config import Configs
 from configs.config_model import MySQLConfig
 import aiomysql
-from models.DTOs import HomeDataDTO, ReviewDTO, ReviewDataDTO, BlogDataDTO, PhotoDataDTO
+from utils.parsers import normalize_tag, parse_business_hours, parse_blog_date, BLOG_DATE_FORMAT, MINUTES_PER_DAY
+from utils.logger import Logger
+from models.DTOs import HomeDataDTO, ReviewDTO, ReviewDataDTO, BlogDataDTO, BlogListDTO, PhotoDataDTO
+from typing import Dict, List, Optional
 
 CONFIG_PATH = "configs/config.toml"
+logger = Logger()
+
 config = Configs(CONFIG_PATH)
 db_config = config.get(MySQLConfig)
 
+# 저장된 영업 구간은 한국 현지 시각 기준 (크롤러도 timezone_id="Asia/Seoul"로 실행)
+PLACE_TIMEZONE = ZoneInfo("Asia/Seoul")
+
+# 영업 구간 하나의 최대 길이. "open at T" 조회에서 open_minute 범위를 좁히는 데 사용
+MAX_OPEN_INTERVAL_MINUTES = MINUTES_PER_DAY
+
 # 환경변수 또는 config에서 DB 접속 정보 읽기
 DATABASE_URL = f"mysql+aiomysql://{db_config.user}:{db_config.pw}@{db_config.host}:{db_config.port}/{db_config.db}?charset=utf8mb4"
 
@@ -45,6 +59,37 @@ def session_scope():
     finally:
         session.close()
 
+async def get_tag_ids(session, names) -> Dict[str, int]:
+    """
+    태그 이름을 tag 테이블에 없으면 추가하고, 이름(소문자) -> id 매핑을 돌려줍니다.
+    """
+    names = sorted(set(names))
+    if not names:
+        return {}
+    await session.execute(mysql_insert(Tag).values([{"name": n} for n in names]).prefix_with("IGNORE"))
+    result = await session.execute(select(Tag.id, Tag.name).where(Tag.name.in_(names)))
+    return {name.lower(): tag_id for tag_id, name in result.all()}
+
+def apply_business_hours(hours: PlaceHours):
+    """
+    PlaceHours의 day/time 문자열을 파싱해 parse_status와 영업 구간(intervals)을 채웁니다.
+    """
+    parsed = parse_business_hours(hours.day, hours.time)
+    if parsed is None:
+        hours.parse_status = "failed"
+        return
+    hours.parse_status = "holiday" if parsed["holiday"] else "ok"
+    hours.intervals = [
+        PlaceOpenInterval(
+            place_id=hours.place_id,
+            weekday=(open_minute // MINUTES_PER_DAY) % 7,
+            open_minute=open_minute,
+            close_minute=close_minute,
+            last_order_minute=last_order
+        )
+        for open_minute, close_minute, last_order in parsed["intervals"]
+    ]
+
 # CRUD 및 트랜잭션 예시
 class DBManager:
     def __init__(self):
@@ -77,74 +122,364 @@ class DBManager:
         await self.create_database_if_not_exists()
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+        # create_all은 이미 있는 테이블을 바꾸지 않으므로 이전 구조의 테이블은 따로 옮긴다
+        await self.migrate_blog_tables()
+        await self.migrate_place_hours()
+        await self.ensure_fulltext_indexes()
+        if await self._has_unindexed_review_tags():
+            await self.rebuild_review_tags()
+
+    async def _get_columns(self, conn, table: str) -> List[str]:
+        result = await conn.execute(
+            text("SELECT column_name FROM information_schema.columns WHERE table_schema = :db AND table_name = :table"),
+            {"db": db_config.db, "table": table}
+        )
+        return [row[0] for row in result.all()]
+
+    async def _drop_foreign_key(self, conn, table: str, column: str):
+        result = await conn.execute(
+            text(
+                "SELECT constraint_name FROM information_schema.key_column_usage "
+                "WHERE table_schema = :db AND table_name = :table AND column_name = :column "
+                "AND referenced_table_name IS NOT NULL"
+            ),
+            {"db": db_config.db, "table": table, "column": column}
+        )
+        for (name,) in result.all():
+            await conn.execute(text(f"ALTER TABLE {table} DROP FOREIGN KEY `{name}`"))
+
+    async def ensure_fulltext_indexes(self):
+        """
+        create_all은 이미 있는 테이블에 인덱스를 추가하지 않으므로, 빠진 FULLTEXT 인덱스를 만듭니다.
+        """
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                text("SELECT DISTINCT index_name FROM information_schema.statistics WHERE table_schema = :db"),
+                {"db": db_config.db}
+            )
+            existing = {row[0] for row in result.all()}
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    if index.dialect_options["mysql"]["prefix"] == "FULLTEXT" and index.name not in existing:
+                        logger.info(f"Creating FULLTEXT index: {index.name}")
+                        await conn.run_sync(index.create)
+
+    async def rebuild_review_tags(self):
+        """
+        review.tags(콤마구분)에서 review_tag를 다시 만듭니다. 태그 테이블이 생기기 전의 데이터 보정용.
+        """
+        async with self.session() as session:
+            try:
+                result = await session.execute(select(Review.id, Review.tags).where(Review.tags.isnot(None)))
+                rows = [(review_id, [normalize_tag(t) for t in tags.split(",") if normalize_tag(t)]) for review_id, tags in result.all()]
+                tag_ids = await get_tag_ids(session, [t for _, tags in rows for t in tags])
+
+                existing = set((await session.execute(select(ReviewTag.review_id, ReviewTag.tag_id))).all())
+                for review_id, tags in rows:
+                    for tag_id in {tag_ids.get(t.lower()) for t in tags}:
+                        if tag_id and (review_id, tag_id) not in existing:
+                            session.add(ReviewTag(review_id=review_id, tag_id=tag_id))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise
+
+    async def _has_unindexed_review_tags(self) -> bool:
+        # review.tags는 있는데 review_tag가 없는 리뷰가 하나라도 있으면 보정 대상
+        async with self.engine.connect() as conn:
+            result = await conn.execute(text(
+                "SELECT 1 FROM review r WHERE r.tags IS NOT NULL AND r.tags <> '' "
+                "AND NOT EXISTS (SELECT 1 FROM review_tag rt WHERE rt.review_id = r.id) LIMIT 1"
+            ))
+            return result.first() is not None
+
+    async def migrate_place_hours(self):
+        """
+        parse_status 컬럼이 없는 이전 place_hours 테이블에 컬럼을 추가하고,
+        이미 수집된 영업시간을 모두 파싱해 place_open_interval을 채웁니다. 이미 새 구조면 아무것도 하지 않습니다.
+        """
+        async with self.engine.begin() as conn:
+            if "parse_status" in await self._get_columns(conn, "place_hours"):
+                return
+            logger.info("Migrating legacy place_hours table")
+            await conn.execute(text(
+                "ALTER TABLE place_hours ADD COLUMN parse_status VARCHAR(10) NULL, "
+                "ADD INDEX ix_place_hours_parse_status (parse_status)"
+            ))
+        # 기존 행은 parse_status가 NULL이므로 재파싱 대상이 된다
+        parsed_count = await self.reprocess_place_hours()
+        logger.info(f"Business Hours Backfilled: {parsed_count} rows parsed")
+
+    async def migrate_blog_tables(self):
+        """
+        가게마다 글 본문을 복사해 두던 이전 blog/blog_image 구조를 blog_post 캐시 구조로 옮깁니다.
+        - blog 행의 글은 blog_url 기준으로 blog_post에 한 번만 저장 (같은 URL이면 가장 최근 행)
+        - blog는 place_id/post_id/rank 링크 행으로 바꾸고, blog_image.blog_id는 post_id로 바꾼다
+        이미 새 구조면 아무것도 하지 않습니다.
+        """
+        async with self.engine.begin() as conn:
+            if "content_fetched_at" not in await self._get_columns(conn, "blog_post"):
+                # 확인 시각과 본문 수신 시각을 나누기 전의 blog_post: 기존 fetched_at을 본문 시각으로 사용
+                await conn.execute(text("ALTER TABLE blog_post ADD COLUMN content_fetched_at DATETIME NULL"))
+                await conn.execute(text("UPDATE blog_post SET content_fetched_at = fetched_at"))
+
+            blog_columns = await self._get_columns(conn, "blog")
+            if "content" not in blog_columns:
+                return
+            logger.info("Migrating legacy blog tables")
+
+            # blog_url이 없던 행도 링크를 유지할 수 있게 임시 키를 만든다
+            legacy_url = "COALESCE(b.blog_url, CONCAT('legacy-blog:', b.id))"
+            await conn.execute(text(
+                "INSERT IGNORE INTO blog_post (blog_url, title, author, date, content, fetched_at, content_fetched_at) "
+                f"SELECT {legacy_url}, b.title, b.author, b.date, b.content, b.created_at, b.created_at "
+                "FROM blog b ORDER BY b.id DESC"
+            ))
+
+            if "post_id" not in blog_columns:
+                await conn.execute(text("ALTER TABLE blog ADD COLUMN post_id INTEGER NULL, ADD COLUMN `rank` INTEGER NULL"))
+            await conn.execute(text(
+                f"UPDATE blog b JOIN blog_post p ON p.blog_url = {legacy_url} "
+                "SET b.post_id = p.id, b.`rank` = 0"
+            ))
+
+            # 글 이미지는 blog_post로 옮긴 행(같은 URL 중 가장 최근 blog)의 것만 남긴다
+            image_columns = await self._get_columns(conn, "blog_image")
+            if "blog_id" in image_columns:
+                if "post_id" not in image_columns:
+                    await conn.execute(text("ALTER TABLE blog_image ADD COLUMN post_id INTEGER NULL"))
+                await conn.execute(text(
+                    "UPDATE blog_image i "
+                    "JOIN blog b ON b.id = i.blog_id "
+                    f"JOIN (SELECT MAX(b.id) AS id FROM blog b GROUP BY {legacy_url}) latest ON latest.id = b.id "
+                    "SET i.post_id = b.post_id"
+                ))
+                await conn.execute(text("DELETE FROM blog_image WHERE post_id IS NULL"))
+                await self._drop_foreign_key(conn, "blog_image", "blog_id")
+                await conn.execute(text(
+                    "ALTER TABLE blog_image DROP COLUMN blog_id, MODIFY post_id INTEGER NOT NULL, "
+                    "ADD FOREIGN KEY (post_id) REFERENCES blog_post (id)"
+                ))
+
+            await conn.execute(text(
+                "ALTER TABLE blog MODIFY post_id INTEGER NOT NULL, "
+                "ADD FOREIGN KEY (post_id) REFERENCES blog_post (id), "
+                "DROP COLUMN title, DROP COLUMN author, DROP COLUMN date, DROP COLUMN content, DROP COLUMN blog_url"
+            ))
 
     async def aclose(self):
         await self.engine.dispose()
 
-    async def add_place_with_all(self, place_data: HomeDataDTO, reviews_list: ReviewDataDTO, blog_data: BlogDataDTO, photo_list: PhotoDataDTO):
+    async def get_cached_blog_posts(self, blog_urls: List[str]) -> Dict[str, BlogDataDTO]:
+        """
+        blog_post 캐시에 이미 있는 글을 blog_url 기준으로 돌려줍니다.
+        """
+        if not blog_urls:
+            return {}
         async with self.session() as session:
-            try:
-                # Place 데이터 저장
-                place = Place(
-                    name=place_data.name,
-                    address=place_data.address,
-                    business_hours=place_data.business_hours
+            result = await session.execute(
+                select(BlogPost).options(selectinload(BlogPost.images)).where(BlogPost.blog_url.in_(blog_urls))
+            )
+            return {
+                post.blog_url: BlogDataDTO(
+                    title=post.title,
+                    author=post.author or "",
+                    date=post.date.strftime(BLOG_DATE_FORMAT) if post.date else "",
+                    content=post.content or "",
+                    blog_url=post.blog_url,
+                    images=[img.image_url for img in post.images],
+                    frame_url=post.frame_url,
+                    etag=post.etag,
+                    last_modified=post.last_modified,
+                    fetched_at=post.fetched_at,
+                    content_fetched_at=post.content_fetched_at,
+                    cached=True
                 )
-                session.add(place)
-                await session.flush()  # place.id 확보
-
-                # PlaceHours 데이터 저장
-                for h in place_data.hours:
-                    session.add(PlaceHours(place_id=place.id, **h.model_dump()))
-
-                # Review 데이터 저장
-                for r in reviews_list.reviews:
-                    review_data: ReviewDTO = r
-                    review = Review(
-                        place_id=place.id,
-                        author=review_data.author,
-                        review_date=review_data.visit_date,
-                        visit_count=review_data.visit_count,
-                        profile_review=review_data.profile.review,
-                        profile_photo=review_data.profile.photo,
-                        profile_follower=review_data.profile.follower,
-                        follow=review_data.follow,
-                        visit_info=review_data.visit_info,
-                        body=review_data.body,
-                        tags=','.join(review_data.tags),
-                        review_more=review_data.review_more,
-                        extra_review_line=review_data.extra_review_line,
-                        receipt=review_data.receipt
-                    )
-                    session.add(review)
-
-                # Blog 데이터 저장
-                if blog_data:
-                    date_str = blog_data.date
-                    date_obj = datetime.strptime(date_str, "%Y. %m. %d. %H:%M")
-                    blog = Blog(
-                        place_id=place.id,
-                        title=blog_data.title,
-                        author=blog_data.author,
-                        date=date_obj,
-                        content=blog_data.content,
-                        blog_url=blog_data.blog_url
-                    )
-                    session.add(blog)
-                    await session.flush()
+                for post in result.scalars()
+            }
+
+    async def _save_blog_post(self, session, blog_data: BlogDataDTO) -> BlogPost:
+        result = await session.execute(select(BlogPost).where(BlogPost.blog_url == blog_data.blog_url))
+        post = result.scalar_one_or_none()
+        if post is None:
+            post = BlogPost(blog_url=blog_data.blog_url)
+            session.add(post)
+        elif blog_data.cached:
+            # 캐시 재사용(또는 304 재검증)이면 본문은 그대로 두고 확인 시각만 갱신
+            post.fetched_at = blog_data.fetched_at
+            return post
+        elif post.content_fetched_at and blog_data.content_fetched_at and post.content_fetched_at > blog_data.content_fetched_at:
+            # 오래된 스냅샷을 reparse 할 때 더 최근에 받은 본문을 덮어쓰지 않는다
+            # (304 재검증은 fetched_at만 바꾸므로 여기 비교에 영향을 주지 않는다)
+            return post
+        else:
+            await session.execute(delete(BlogImage).where(BlogImage.post_id == post.id))
+
+        post.title = blog_data.title
+        post.author = blog_data.author
+        post.date = parse_blog_date(blog_data.date, blog_data.content_fetched_at or blog_data.fetched_at)
+        post.content = blog_data.content
+        # reparse처럼 검증 헤더 없이 들어온 글은 기존 값을 유지해 조건부 요청을 계속 쓸 수 있게 한다
+        post.frame_url = blog_data.frame_url or post.frame_url
+        post.etag = blog_data.etag or post.etag
+        post.last_modified = blog_data.last_modified or post.last_modified
+        now = datetime.now()
+        post.fetched_at = blog_data.fetched_at or post.fetched_at or now
+        post.content_fetched_at = blog_data.content_fetched_at or now
+        await session.flush()  # post.id 확보
 
-                    # BlogImage 데이터 저장
-                    for img_url in blog_data.images:
-                        session.add(BlogImage(blog_id=blog.id, image_url=img_url))
+        # BlogImage 데이터 저장
+        for img_url in blog_data.images:
+            session.add(BlogImage(post_id=post.id, image_url=img_url))
+        return post
 
-                # PlacePhoto 데이터 저장
-                for img_url in photo_list.images:
-                    session.add(PlacePhoto(place_id=place.id, image_url=img_url))
-                    
+    async def _insert_place(self, session, place_data: HomeDataDTO, reviews_list: ReviewDataDTO, blog_list: BlogListDTO, photo_list: PhotoDataDTO):
+        # Place 데이터 저장
+        place = Place(
+            name=place_data.name,
+            address=place_data.address,
+            business_hours=place_data.business_hours
+        )
+        session.add(place)
+        await session.flush()  # place.id 확보
+
+        # PlaceHours 데이터 저장 (영업 구간 인덱스도 함께 생성)
+        for h in place_data.hours:
+            hours = PlaceHours(place_id=place.id, **h.model_dump())
+            apply_business_hours(hours)
+            session.add(hours)
+
+        # 리뷰 태그를 tag 테이블로 정규화
+        tag_ids = await get_tag_ids(
+            session, [normalize_tag(t) for r in reviews_list.reviews for t in (r.tags or []) if normalize_tag(t)]
+        )
+
+        # Review 데이터 저장
+        for r in reviews_list.reviews:
+            review_data: ReviewDTO = r
+            review = Review(
+                place_id=place.id,
+                author=review_data.author,
+                review_date=review_data.visit_date,
+                visit_count=review_data.visit_count,
+                profile_review=review_data.profile.review,
+                profile_photo=review_data.profile.photo,
+                profile_follower=review_data.profile.follower,
+                follow=review_data.follow,
+                visit_info=review_data.visit_info,
+                body=review_data.body,
+                tags=','.join(review_data.tags),
+                review_more=review_data.review_more,
+                extra_review_line=review_data.extra_review_line,
+                receipt=review_data.receipt
+            )
+            review_tag_ids = {tag_ids.get(normalize_tag(t).lower()) for t in (review_data.tags or [])}
+            review.tag_links = [ReviewTag(tag_id=tag_id) for tag_id in review_tag_ids if tag_id]
+            session.add(review)
+
+        # Blog 데이터 저장 (글 본문은 blog_post 캐시에 저장하고 가게와는 링크만 연결)
+        if blog_list:
+            for rank, blog_data in enumerate(blog_list.blogs):
+                # 글 하나의 저장 실패가 가게 전체 저장을 롤백하지 않도록 글마다 savepoint 사용
+                try:
+                    async with session.begin_nested():
+                        post = await self._save_blog_post(session, blog_data)
+                        session.add(Blog(place_id=place.id, post_id=post.id, rank=rank))
+                except Exception as e:
+                    logger.error(f"Blog Save Failed: {blog_data.blog_url} {str(e)}")
+
+        # PlacePhoto 데이터 저장
+        for img_url in photo_list.images:
+            session.add(PlacePhoto(place_id=place.id, image_url=img_url))
+
+    async def _delete_places(self, session, name: str):
+        # 같은 가게의 기존 행을 자식 테이블부터 지운다
+        place_ids = select(Place.id).where(Place.name == name)
+        # blog_post는 다른 가게와 공유하는 캐시이므로 링크만 지운다
+        await session.execute(delete(Blog).where(Blog.place_id.in_(place_ids)))
+        review_ids = select(Review.id).where(Review.place_id.in_(place_ids))
+        await session.execute(delete(ReviewTag).where(ReviewTag.review_id.in_(review_ids)))
+        await session.execute(delete(Review).where(Review.place_id.in_(place_ids)))
+        await session.execute(delete(PlaceOpenInterval).where(PlaceOpenInterval.place_id.in_(place_ids)))
+        await session.execute(delete(PlaceHours).where(PlaceHours.place_id.in_(place_ids)))
+        await session.execute(delete(PlacePhoto).where(PlacePhoto.place_id.in_(place_ids)))
+        await session.execute(delete(Place).where(Place.name == name))
+
+    async def add_place_with_all(self, place_data: HomeDataDTO, reviews_list: ReviewDataDTO, blog_list: BlogListDTO, photo_list: PhotoDataDTO):
+        async with self.session() as session:
+            try:
+                await self._insert_place(session, place_data, reviews_list, blog_list, photo_list)
                 # 트랜잭션 커밋
                 await session.commit()
             except Exception as e:
-                # 롤백은 session_scope에서 자동 처리
+                await session.rollback()
+                raise
+
+    async def delete_places_by_name(self, name: str):
+        async with self.session() as session:
+            try:
+                await self._delete_places(session, name)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise
+
+    async def replace_place(self, place_data: HomeDataDTO, reviews_list: ReviewDataDTO, blog_list: BlogListDTO, photo_list: PhotoDataDTO):
+        """
+        같은 이름의 가게 행을 지우고 다시 저장합니다. (reparse용)
+        삭제와 저장을 한 트랜잭션에서 처리하므로 저장이 실패하면 기존 행도 그대로 남습니다.
+        """
+        async with self.session() as session:
+            try:
+                await self._delete_places(session, place_data.name)
+                await self._insert_place(session, place_data, reviews_list, blog_list, photo_list)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                raise
+
+    async def get_open_place_ids(self, at: Optional[datetime] = None) -> List[int]:
+        """
+        at(기본: 현재 시각)에 영업 중인 place.id 목록을 반환합니다.
+        timezone 없는 at은 한국 시각으로 보고, timezone이 있으면 한국 시각으로 바꿔서 계산합니다.
+        구간 길이가 MAX_OPEN_INTERVAL_MINUTES 이하이므로 open_minute 범위 조회 한 번으로 끝난다.
+        """
+        if at is None:
+            at = datetime.now(PLACE_TIMEZONE)
+        elif at.tzinfo is not None:
+            at = at.astimezone(PLACE_TIMEZONE)
+        week_minute = at.weekday() * MINUTES_PER_DAY + at.hour * 60 + at.minute
+        async with self.session() as session:
+            result = await session.execute(
+                select(PlaceOpenInterval.place_id)
+                .where(
+                    PlaceOpenInterval.open_minute.between(week_minute - MAX_OPEN_INTERVAL_MINUTES, week_minute),
+                    PlaceOpenInterval.close_minute > week_minute
+                )
+                .distinct()
+            )
+            return list(result.scalars())
+
+    async def reprocess_place_hours(self) -> int:
+        """
+        파싱에 실패했던(또는 파싱 전의) PlaceHours를 다시 파싱하고, 새로 해석된 행 수를 반환합니다.
+        """
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    select(PlaceHours)
+                    .options(selectinload(PlaceHours.intervals))
+                    .where((PlaceHours.parse_status == "failed") | (PlaceHours.parse_status.is_(None)))
+                )
+                parsed_count = 0
+                for hours in result.scalars():
+                    apply_business_hours(hours)
+                    if hours.parse_status != "failed":
+                        parsed_count += 1
+                await session.commit()
+                return parsed_count
+            except Exception as e:
+                await session.rollback()
                 raise
 
     # 예시: 단일 Place 조회
@@ -2,7 +2,7 @@ from sqlalchemy.orm import (
     declarative_base, relationship
 )
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, Text, ForeignKey, TIMESTAMP, text
+    Column, Integer, String, Boolean, DateTime, Text, ForeignKey, TIMESTAMP, Index, text
 )
 # SQLAlchemy Base
 Base = declarative_base()
@@ -15,6 +15,7 @@ class Place(Base):
     address = Column(String(255), nullable=False)
     business_hours = Column(String(255), nullable=True)
     hours = relationship("PlaceHours", back_populates="place", cascade="all, delete-orphan")
+    open_intervals = relationship("PlaceOpenInterval", back_populates="place", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="place", cascade="all, delete-orphan")
     blogs = relationship("Blog", back_populates="place", cascade="all, delete-orphan")
     photos = relationship("PlacePhoto", back_populates="place", cascade="all, delete-orphan")
@@ -26,9 +27,27 @@ class PlaceHours(Base):
     place_id = Column(Integer, ForeignKey("place.id"), nullable=False)
     day = Column(String(10), nullable=False)
     time = Column(String(50), nullable=False)
+    parse_status = Column(String(10), nullable=True, index=True)  # ok / holiday / failed (failed는 재파싱 대상)
     place = relationship("Place", back_populates="hours")
+    intervals = relationship("PlaceOpenInterval", back_populates="hours", cascade="all, delete-orphan")
     created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), nullable=True)
 
+class PlaceOpenInterval(Base):
+    # 영업 중인 구간 (월요일 00:00 = 0 기준의 주간 분, 브레이크타임 제외, 자정 넘김은 close_minute > 다음 날)
+    __tablename__ = "place_open_interval"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    place_id = Column(Integer, ForeignKey("place.id"), nullable=False, index=True)
+    place_hours_id = Column(Integer, ForeignKey("place_hours.id"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0=월 ... 6=일
+    open_minute = Column(Integer, nullable=False)
+    close_minute = Column(Integer, nullable=False)
+    last_order_minute = Column(Integer, nullable=True)
+    place = relationship("Place", back_populates="open_intervals")
+    hours = relationship("PlaceHours", back_populates="intervals")
+    __table_args__ = (
+        Index("ix_place_open_interval_range", "open_minute", "close_minute", "place_id"),
+    )
+
 class Review(Base):
     __tablename__ = "review"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -42,32 +61,73 @@ class Review(Base):
     follow = Column(Boolean, nullable=True)
     visit_info = Column(String(255), nullable=True)
     body = Column(Text, nullable=True)
-    tags = Column(String(255), nullable=True)  # 콤마구분
+    tags = Column(String(255), nullable=True)  # 콤마구분 (검색은 review_tag 사용)
     review_more = Column(Boolean, nullable=True)
     extra_review_line = Column(String(255), nullable=True)
     receipt = Column(String(50), nullable=True)
     place = relationship("Place", back_populates="reviews")
+    tag_links = relationship("ReviewTag", back_populates="review", cascade="all, delete-orphan")
     created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), nullable=True)
+    __table_args__ = (
+        # 한국어 검색용 n-gram FULLTEXT 인덱스
+        Index("ft_review_body", "body", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
+class Tag(Base):
+    __tablename__ = "tag"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)
+    review_links = relationship("ReviewTag", back_populates="tag")
+    __table_args__ = (
+        # "맛있어요"로 "음식이 맛있어요" 태그를 찾을 수 있도록 부분 일치용 ngram 인덱스
+        Index("ft_tag_name", "name", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
+class ReviewTag(Base):
+    __tablename__ = "review_tag"
+    review_id = Column(Integer, ForeignKey("review.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tag.id"), primary_key=True, index=True)
+    review = relationship("Review", back_populates="tag_links")
+    tag = relationship("Tag", back_populates="review_links")
 
 class Blog(Base):
+    # 가게 <-> 블로그 글 연결 (본문은 blog_post에 한 번만 저장)
     __tablename__ = "blog"
     id = Column(Integer, primary_key=True, autoincrement=True)
     place_id = Column(Integer, ForeignKey("place.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("blog_post.id"), nullable=False)
+    rank = Column(Integer, nullable=True)  # 블로그 리뷰 탭에서의 순서
+    place = relationship("Place", back_populates="blogs")
+    post = relationship("BlogPost", back_populates="links")
+    created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), nullable=True)
+
+class BlogPost(Base):
+    # blog_url 기준 블로그 글 캐시 (여러 가게/여러 번의 크롤링에서 공유)
+    __tablename__ = "blog_post"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    blog_url = Column(String(255), nullable=False, unique=True)
+    frame_url = Column(String(500), nullable=True)  # mainFrame(PostView) 주소, 재검증 요청에 사용
     title = Column(String(255), nullable=False)
     author = Column(String(100), nullable=True)
     date = Column(DateTime, nullable=True)
     content = Column(Text, nullable=True)
-    blog_url = Column(String(255), nullable=True)
-    images = relationship("BlogImage", back_populates="blog", cascade="all, delete-orphan")
-    place = relationship("Place", back_populates="blogs")
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    fetched_at = Column(DateTime, nullable=True)  # 마지막으로 확인한 시각 (304 재검증 포함)
+    content_fetched_at = Column(DateTime, nullable=True)  # 본문을 실제로 받은 시각 (스냅샷 최신 여부 비교용)
+    images = relationship("BlogImage", back_populates="post", cascade="all, delete-orphan")
+    links = relationship("Blog", back_populates="post")
     created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), nullable=True)
+    __table_args__ = (
+        Index("ft_blog_post_title_content", "title", "content", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
 
 class BlogImage(Base):
     __tablename__ = "blog_image"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    blog_id = Column(Integer, ForeignKey("blog.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("blog_post.id"), nullable=False)
     image_url = Column(String(255), nullable=False)
-    blog = relationship("Blog", back_populates="images")
+    post = relationship("BlogPost", back_populates="images")
     created_at = Column(TIMESTAMP, server_default=text('CURRENT_TIMESTAMP'), nullable=True)
 
 class PlacePhoto(Base):
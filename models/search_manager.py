@@ -0,0 +1,68 @@
+from typing import List
+from sqlalchemy import text
+from models.db_manager import Session, async_engine
+
+# 출처별 가중치. MATCH 관련도는 출처(인덱스)마다 크기가 달라서 그대로 더하지 않고,
+# 각 출처에서 이번 검색의 최대값으로 나눠 0~1로 맞춘 뒤 가중치를 곱해 가게별로 더한다.
+# 즉 일치하는 리뷰/블로그 글/리뷰 태그 한 건이 최대 가중치만큼 점수에 기여한다.
+REVIEW_WEIGHT = 1.0
+BLOG_WEIGHT = 1.0
+TAG_WEIGHT = 0.5  # 태그는 짧은 정해진 문구라 본문 언급보다 낮게 본다
+
+# review.body / blog_post(title, content) / tag.name 모두 ngram FULLTEXT 인덱스로만 조회해서
+# 테이블 스캔 없이 가게 순위를 만든다 (MAX() OVER ()는 MySQL 8 윈도 함수)
+SEARCH_PLACES_SQL = text("""
+    SELECT s.place_id, SUM(s.weight * s.score / s.max_score) AS total_score
+    FROM (
+        SELECT r.place_id, :review_weight AS weight,
+               MATCH(r.body) AGAINST(:phrase IN BOOLEAN MODE) AS score,
+               MAX(MATCH(r.body) AGAINST(:phrase IN BOOLEAN MODE)) OVER () AS max_score
+        FROM review r
+        WHERE MATCH(r.body) AGAINST(:phrase IN BOOLEAN MODE)
+        UNION ALL
+        SELECT b.place_id, :blog_weight AS weight,
+               MATCH(p.title, p.content) AGAINST(:phrase IN BOOLEAN MODE) AS score,
+               MAX(MATCH(p.title, p.content) AGAINST(:phrase IN BOOLEAN MODE)) OVER () AS max_score
+        FROM blog_post p
+        JOIN blog b ON b.post_id = p.id
+        WHERE MATCH(p.title, p.content) AGAINST(:phrase IN BOOLEAN MODE)
+        UNION ALL
+        SELECT r.place_id, :tag_weight AS weight,
+               MATCH(t.name) AGAINST(:phrase IN BOOLEAN MODE) AS score,
+               MAX(MATCH(t.name) AGAINST(:phrase IN BOOLEAN MODE)) OVER () AS max_score
+        FROM tag t
+        JOIN review_tag rt ON rt.tag_id = t.id
+        JOIN review r ON r.id = rt.review_id
+        WHERE MATCH(t.name) AGAINST(:phrase IN BOOLEAN MODE)
+    ) s
+    GROUP BY s.place_id
+    ORDER BY total_score DESC
+    LIMIT :limit
+""")
+
+
+class SearchManager:
+    def __init__(self):
+        self.engine = async_engine
+        self.session = Session
+
+    async def search_places(self, query: str, limit: int = 20) -> List[int]:
+        """
+        리뷰 본문, 블로그 제목/본문, 리뷰 태그에서 query를 찾아 관련도 순으로 place.id 목록을 반환합니다.
+        ngram 토큰 크기(기본 2)보다 짧은 검색어는 일치하지 않습니다. 점수 계산은 REVIEW_WEIGHT 주석 참고.
+        """
+        words = query.replace('"', " ").split()
+        if not words:
+            return []
+
+        # 따옴표로 감싼 구문 검색 -> ngram 토큰이 연속으로 모두 있어야 일치 (LIKE '%query%'와 같은 의미)
+        params = {
+            "phrase": '"' + " ".join(words) + '"',
+            "review_weight": REVIEW_WEIGHT,
+            "blog_weight": BLOG_WEIGHT,
+            "tag_weight": TAG_WEIGHT,
+            "limit": limit
+        }
+        async with self.session() as session:
+            result = await session.execute(SEARCH_PLACES_SQL, params)
+            return [place_id for place_id, _ in result.all()]
@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from models.db_manager import DBManager
+from models.DTOs import HomeDataDTO, ReviewDataDTO, BlogDataDTO, BlogListDTO, PhotoDataDTO
+from configs.config import Configs
+from configs.config_model import SnapshotConfig
+from utils.snapshot import SnapshotArchive
+from utils.parsers import parse_home_html, parse_blog_html, parse_review_text
+from utils.logger import Logger
+logger = Logger()
+
+CONFIG_PATH = "configs/config.toml"
+
+
+def _manifest_blogs(manifest: dict):
+    if manifest.get("blog_html"):
+        # 단일 블로그만 저장하던 이전 형식의 매니페스트
+        return [manifest["blog_url"]], [{"url": manifest["blog_url"], "html": manifest["blog_html"]}]
+    return manifest.get("blog_urls", []), manifest.get("blogs", [])
+
+
+def blog_snapshot_index(archive: SnapshotArchive) -> dict:
+    """
+    모든 매니페스트에서 blog_url -> 가장 최근에 저장된 블로그 HTML(해시, 수집 시각)을 모읍니다.
+    캐시에서 재사용된 글은 그 크롤링의 매니페스트에 HTML이 없으므로, 다른 가게/이전 실행의 스냅샷에서 찾는다.
+    """
+    index = {}
+    for path in archive.list_manifests():
+        manifest = archive.load_manifest(path)
+        for snapshot in _manifest_blogs(manifest)[1]:
+            current = index.get(snapshot["url"])
+            if current is None or current["captured_at"] < manifest["captured_at"]:
+                index[snapshot["url"]] = {"html": snapshot["html"], "captured_at": manifest["captured_at"]}
+    return index
+
+
+async def _rebuild(archive: SnapshotArchive, manifest: dict, blog_index: dict) -> dict:
+    if not manifest.get("entry_html"):
+        raise ValueError(f"entry_html is missing: {manifest['store_name']}")
+
+    home = parse_home_html(archive.get_text(manifest["entry_html"]), manifest["store_name"])
+
+    reviews = []
+    for digest in manifest.get("review_texts", []):
+        reviews.append(await parse_review_text(archive.get_text(digest)))
+
+    blog_urls = _manifest_blogs(manifest)[0]
+
+    # 아카이브 어디에도 HTML이 없는 글은 blog_url만 넘기고 DB 캐시와 연결한다
+    blogs = {}
+    for url in blog_urls:
+        snapshot = blog_index.get(url)
+        if snapshot is None:
+            continue
+        blog = parse_blog_html(archive.get_text(snapshot["html"]))
+        blog.update({"blog_url": url, "content_fetched_at": datetime.fromisoformat(snapshot["captured_at"])})
+        blogs[url] = blog
+
+    return {
+        "store_name": manifest["store_name"],
+        "home": home,
+        "reviews": {"reviews": reviews},
+        "blog_urls": blog_urls,
+        "blogs": blogs,
+        "photos": {"images": manifest.get("photos", [])}
+    }
+
+
+def rebuild_snapshot(root_dir: str, manifest_path: str, blog_index: dict) -> dict:
+    """
+    매니페스트 하나를 브라우저 없이 다시 파싱합니다. (ProcessPoolExecutor 워커에서 실행)
+    """
+    archive = SnapshotArchive(root_dir)
+    return asyncio.run(_rebuild(archive, archive.load_manifest(manifest_path), blog_index))
+
+
+def latest_manifests(archive: SnapshotArchive, store_name=None):
+    # 같은 가게를 여러 번 수집했다면 가장 최근 스냅샷만 사용 (파일명이 시각 순)
+    latest = {}
+    for path in archive.list_manifests(store_name):
+        latest[archive.load_manifest(path)["store_name"]] = path
+    return list(latest.values())
+
+
+async def reprocess_hours():
+    db = DBManager()
+    try:
+        await db.create_all_tables()  # 이전 구조의 place_hours면 컬럼 추가 및 전체 파싱까지 수행
+        parsed_count = await db.reprocess_place_hours()
+        logger.info(f"Business Hours Reprocessed: {parsed_count} rows parsed")
+    finally:
+        await db.aclose()
+
+
+async def main(store_name=None, workers=None, dry_run=False):
+    snapshot_config = Configs(CONFIG_PATH).get(SnapshotConfig) or SnapshotConfig()
+    archive = SnapshotArchive(snapshot_config.dir, snapshot_config.level)
+    manifests = latest_manifests(archive, store_name)
+    blog_index = blog_snapshot_index(archive)
+    workers = workers or snapshot_config.workers or os.cpu_count()
+    logger.info(f"Reparse Started: {len(manifests)} snapshots, {workers} workers")
+
+    db = DBManager()
+    loop = asyncio.get_running_loop()
+    try:
+        if not dry_run:
+            await db.create_all_tables()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                loop.run_in_executor(executor, rebuild_snapshot, archive.root_dir, path, blog_index)
+                for path in manifests
+            ]
+            for future in asyncio.as_completed(futures):
+                try:
+                    result = await future
+                    home_data = HomeDataDTO(**result["home"])
+                    review_data = ReviewDataDTO(**result["reviews"])
+                    photo_data = PhotoDataDTO(**result["photos"])
+                except Exception as e:
+                    logger.error(f"Reparse Failed: {str(e)}")
+                    continue
+
+                if dry_run:
+                    logger.info(f"Reparse Done (dry run): {home_data.name}")
+                    continue
+
+                try:
+                    missing = [url for url in result["blog_urls"] if url not in result["blogs"]]
+                    cached_posts = await db.get_cached_blog_posts(missing)
+                    blog_data = BlogListDTO(blogs=[
+                        BlogDataDTO(**result["blogs"][url]) if url in result["blogs"] else cached_posts[url]
+                        for url in result["blog_urls"]
+                        if url in result["blogs"] or url in cached_posts
+                    ])
+
+                    # 삭제와 재저장을 한 트랜잭션으로 처리 (실패하면 기존 행 유지)
+                    await db.replace_place(home_data, review_data, blog_data, photo_data)
+                    logger.info(f"Reparse Done: {home_data.name}")
+                except Exception as e:
+                    logger.error(f"Reparse Save Failed: {home_data.name} {str(e)}")
+    finally:
+        await db.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild DB rows from the snapshot archive without a browser")
+    parser.add_argument("--store", type=str, default=None, help="Only reparse snapshots of this store")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parser processes")
+    parser.add_argument("--dry-run", action="store_true", help="Parse only, do not write to the DB")
+    parser.add_argument("--hours", action="store_true", help="Only re-parse business hours rows that failed to parse before")
+    args = parser.parse_args()
+
+    if args.hours:
+        asyncio.run(reprocess_hours())
+    else:
+        asyncio.run(main(args.store, args.workers, args.dry_run))
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+from models.db_manager import DBManager
+from models.search_manager import SearchManager
+from utils.logger import Logger
+logger = Logger()
+
+
+async def main(query=None, limit=20, rebuild=False):
+    db = DBManager()
+    search = SearchManager()
+    try:
+        if rebuild:
+            await db.create_all_tables()  # 빠진 FULLTEXT 인덱스 생성 포함
+            await db.rebuild_review_tags()
+            logger.info("Search Index Rebuilt")
+
+        if query:
+            place_ids = await search.search_places(query, limit)
+            logger.info(f"Search Result ({query}): {place_ids}")
+            return place_ids
+    finally:
+        await db.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search places by review/blog text and review tags")
+    parser.add_argument("query", type=str, nargs="?", default=None, help="Keyword to search")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of place ids")
+    parser.add_argument("--rebuild", action="store_true", help="Create missing FULLTEXT indexes and re-run the review tag backfill")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.query, args.limit, args.rebuild))
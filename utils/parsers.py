@@ -0,0 +1,287 @@
+import re
+from datetime import datetime, timedelta
+from bs4 import BeautifulSoup
+
+# 네이버 지도/블로그 셀렉터 (클래스명이 바뀌면 여기만 수정)
+ADDRESS_SELECTOR = "span.LDgIH"
+BUSINESS_HOURS_SELECTOR = "span.U7pYf"
+HOURS_ROW_SELECTOR = "div.w9QyJ"
+HOURS_DAY_SELECTOR = "span.A_cdD span.i8cJw"
+HOURS_TIME_SELECTOR = "div.H3ua4"
+
+BLOG_LINK_SELECTOR = "ul li.EblIP a"
+BLOG_TITLE_SELECTOR = ".se-module.se-module-text.se-title-text"
+BLOG_AUTHOR_SELECTOR = ".link.pcol2"
+BLOG_DATE_SELECTOR = ".se_publishDate.pcol2"
+BLOG_CONTENT_SELECTOR = ".se-component.se-text.se-l-default"
+BLOG_IMAGE_SELECTOR = "div.se-component.se-image.se-l-default.__se-component img"
+
+
+# 영업시간 파싱용 (분 단위, 월요일 00:00 = 0 기준의 "주간 분")
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAY_INDEX = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+DAY_GROUPS = {"매일": [0, 1, 2, 3, 4, 5, 6], "평일": [0, 1, 2, 3, 4], "주말": [5, 6]}
+DAY_RANGE_PATTERN = re.compile(r"([월화수목금토일])[~-]([월화수목금토일])")
+# "11:00 - 21:00", "15:00 - 17:00 브레이크타임", "20:30 라스트오더" (줄바꿈 없이 붙어 있어도 분리됨)
+TIME_TOKEN_PATTERN = re.compile(r"(\d{1,2}):(\d{2})(?:\s*[-~]\s*(?:다음\s*날\s*)?(\d{1,2}):(\d{2}))?\s*([^\d]*)")
+
+
+def _select_text(soup, selector: str) -> str:
+    elem = soup.select_one(selector)
+    return elem.get_text().strip() if elem else ""
+
+
+def parse_home_html(html: str, name: str) -> dict:
+    """
+    entryIframe HTML(영업시간 펼쳐보기 이후)에서 홈 탭 데이터를 파싱합니다.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    hours = []
+    for div in soup.select(HOURS_ROW_SELECTOR):
+        day_elem = div.select_one(HOURS_DAY_SELECTOR)
+        time_elem = div.select_one(HOURS_TIME_SELECTOR)
+        if day_elem and time_elem:
+            hours.append({"day": day_elem.get_text().strip(), "time": time_elem.get_text().strip()})
+
+    return {
+        "name": name,
+        "address": _select_text(soup, ADDRESS_SELECTOR),
+        "business_hours": _select_text(soup, BUSINESS_HOURS_SELECTOR),
+        "hours": hours
+    }
+
+
+def parse_blog_html(html: str) -> dict:
+    """
+    블로그 mainFrame HTML에서 제목, 작성자, 작성일, 본문, 이미지 목록을 파싱합니다.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    sum_contents = ""
+    for content in soup.select(BLOG_CONTENT_SELECTOR):
+        sum_contents += content.get_text().replace("\u200b", "").strip()
+
+    image_list = []
+    for element in soup.select(BLOG_IMAGE_SELECTOR):
+        src = element.get("data-lazy-src")
+        if src:
+            image_list.append(src)
+
+    return {
+        "title": _select_text(soup, BLOG_TITLE_SELECTOR),
+        "author": _select_text(soup, BLOG_AUTHOR_SELECTOR),
+        "date": _select_text(soup, BLOG_DATE_SELECTOR),
+        "content": sum_contents,
+        "images": image_list
+    }
+
+
+BLOG_DATE_FORMAT = "%Y. %m. %d. %H:%M"
+BLOG_RELATIVE_DATE_PATTERN = re.compile(r"(\d+)\s*(분|시간|일)\s*전")
+
+
+def parse_blog_date(date_text: str, now: datetime = None):
+    """
+    블로그 작성일을 datetime으로 변환합니다. ("2024. 5. 13. 18:20", "2024. 5. 13.", "3시간 전", "방금 전")
+    해석할 수 없으면 None을 반환합니다. (글 하나의 날짜 때문에 저장 전체가 실패하지 않도록)
+    """
+    date_text = (date_text or "").strip()
+    if not date_text:
+        return None
+    now = now or datetime.now()
+    for fmt in (BLOG_DATE_FORMAT, "%Y. %m. %d."):
+        try:
+            return datetime.strptime(date_text, fmt)
+        except ValueError:
+            pass
+    if "방금" in date_text:
+        return now
+    relative_match = BLOG_RELATIVE_DATE_PATTERN.search(date_text)
+    if relative_match:
+        amount, unit = int(relative_match.group(1)), relative_match.group(2)
+        unit_delta = {"분": timedelta(minutes=1), "시간": timedelta(hours=1), "일": timedelta(days=1)}[unit]
+        return (now - amount * unit_delta).replace(second=0, microsecond=0)
+    return None
+
+
+def normalize_tag(tag: str) -> str:
+    """
+    리뷰 태그를 검색용으로 정규화합니다. (공백 정리, tag.name 길이 제한)
+    """
+    return " ".join(tag.split())[:100]
+
+
+def _parse_days(day: str):
+    # "월(5/13)" 같은 날짜 표기를 지우고 "일요일" -> "일"로 맞춘다
+    day = re.sub(r"\(.*?\)", "", day).replace("요일", "").strip()
+    for keyword, days in DAY_GROUPS.items():
+        if keyword in day:
+            return days
+
+    # 요일 토큰("월", "월~금", "월, 수")만 허용한다.
+    # "공휴일", "휴무일", "5월 1일"처럼 요일에 묶이지 않는 표기는 None (요일 규칙으로 표현할 수 없음)
+    days = []
+    for token in re.split(r"[,·/\s]+", re.sub(r"\s*([~-])\s*", r"\1", day)):
+        range_match = DAY_RANGE_PATTERN.fullmatch(token)
+        if range_match:
+            start, end = DAY_INDEX[range_match.group(1)], DAY_INDEX[range_match.group(2)]
+            days.extend((start + i) % 7 for i in range((end - start) % 7 + 1))
+        elif token in DAY_INDEX:
+            days.append(DAY_INDEX[token])
+        elif token:
+            return None
+    return sorted(set(days)) or None
+
+
+def _to_minute(hour: str, minute: str):
+    hour, minute = int(hour), int(minute)
+    if hour > 24 or minute >= 60 or (hour == 24 and minute > 0):
+        return None
+    return hour * 60 + minute
+
+
+def parse_business_hours(day: str, time_text: str):
+    """
+    PlaceHours의 day/time 문자열을 주간 분 단위 영업 구간으로 변환합니다.
+
+    반환값: {"holiday": bool, "intervals": [(open_minute, close_minute, last_order_minute), ...]}
+    - 브레이크타임은 영업 구간에서 빼고, 자정을 넘기는 영업은 다음 날로 이어지는 구간으로 만듭니다.
+    - 일요일 밤 -> 월요일 새벽처럼 주를 넘기면 두 구간으로 나눕니다.
+    해석할 수 없으면 None (원본은 PlaceHours에 남겨 나중에 다시 파싱)
+    """
+    days = _parse_days(day)
+    if days is None:
+        return None
+    if "휴무" in time_text or "휴일" in time_text:
+        return {"holiday": True, "intervals": []}
+
+    spans, breaks, last_orders = [], [], []
+    if "24시간" in time_text:
+        spans.append((0, MINUTES_PER_DAY))
+    for m in TIME_TOKEN_PATTERN.finditer(time_text):
+        start = _to_minute(m.group(1), m.group(2))
+        label = m.group(5).replace(" ", "")
+        if start is None:
+            return None
+        if m.group(3) is None:
+            if "라스트오더" in label or "L.O" in label.upper():
+                last_orders.append(start)
+                continue
+            return None
+        end = _to_minute(m.group(3), m.group(4))
+        if end is None:
+            return None
+        if end <= start:
+            end += MINUTES_PER_DAY  # 자정을 넘기는 영업
+        if "브레이크" in label or "휴게" in label:
+            breaks.append((start, end))
+        else:
+            spans.append((start, end))
+    if not spans:
+        return None
+
+    # 브레이크타임을 빼서 실제로 열려 있는 구간만 남긴다
+    segments = []
+    for open_minute, close_minute in sorted(spans):
+        pieces = [(open_minute, close_minute)]
+        for break_start, break_end in breaks:
+            if break_start < open_minute:
+                break_start, break_end = break_start + MINUTES_PER_DAY, break_end + MINUTES_PER_DAY
+            pieces = [
+                piece
+                for s, e in pieces
+                for piece in ((s, min(e, break_start)), (max(s, break_end), e))
+                if piece[0] < piece[1]
+            ]
+        segments.extend(pieces)
+
+    # 라스트오더는 해당 시각을 포함하는 구간(없으면 마지막 구간)에 붙인다
+    segment_last_orders = [None] * len(segments)
+    for last_order in last_orders:
+        if segments and last_order < segments[0][0]:
+            last_order += MINUTES_PER_DAY
+        index = next((i for i, (s, e) in enumerate(segments) if s < last_order <= e), len(segments) - 1)
+        segment_last_orders[index] = last_order
+
+    intervals = []
+    for weekday in days:
+        base = weekday * MINUTES_PER_DAY
+        for (open_minute, close_minute), last_order in zip(segments, segment_last_orders):
+            open_minute, close_minute = base + open_minute, base + close_minute
+            last_order = base + last_order if last_order is not None else None
+            if close_minute <= MINUTES_PER_WEEK:
+                intervals.append((open_minute, close_minute, last_order))
+                continue
+            # 일요일 -> 월요일로 넘어가는 구간은 주 끝/주 시작 두 개로 나눈다
+            wrapped_last_order = last_order - MINUTES_PER_WEEK if last_order is not None and last_order > MINUTES_PER_WEEK else None
+            intervals.append((open_minute, MINUTES_PER_WEEK, last_order if wrapped_last_order is None else None))
+            intervals.append((0, close_minute - MINUTES_PER_WEEK, wrapped_last_order))
+
+    return {"holiday": False, "intervals": intervals}
+
+
+async def parse_review_text(review_text: str) -> dict:
+    """
+    네이버 리뷰 원본 텍스트를 의미별로 파싱해 딕셔너리로 반환합니다.
+    """
+    lines = [line for line in review_text.split('\n') if line.strip()]
+
+    # 1. 작성자
+    author = lines[0] if len(lines) > 0 else None
+
+    # 2. 프로필 정보
+    profile_match = re.search(r'리뷰 (\d+)사진 (\d+)팔로워 (\d+)', lines[1]) if len(lines) > 1 else None
+    profile = {
+        "review": int(profile_match.group(1)) if profile_match else None,
+        "photo": int(profile_match.group(2)) if profile_match else None,
+        "follower": int(profile_match.group(3)) if profile_match else None,
+    }
+
+    # 3. 팔로우 여부
+    follow = any("follow" in l for l in lines[:4])
+
+    # 4. 방문정보
+    visit_info = None
+    for l in lines[2:6]:
+        if any(x in l for x in ["방문", "예약", "대기", "입장", "일상", "지인", "동료"]):
+            visit_info = l
+            break
+
+    # 5. 본문(리뷰 내용)
+    body_lines = []
+    for line in lines[4:]:
+        if "더보기" in line:
+            break
+        body_lines.append(line)
+    body = " ".join(body_lines)
+
+    # 6. 태그
+    tag_line = next((l for l in lines if "+" in l or "음식이 맛있어요" in l), None)
+    tags = []
+    if tag_line:
+        tags = re.findall(r"[가-힣A-Za-z0-9\s]+", tag_line)
+        tags = [t.strip() for t in tags if t.strip() and t.strip() != "+4"]
+
+    # 7. 추가 리뷰 안내
+    extra_review_line = next((l for l in lines if "개의 리뷰가 더 있습니다" in l), None)
+
+    # 8. 방문일, 방문차수, 인증수단
+    visit_date = next((l for l in lines if re.match(r"\d{4}년", l)), None)
+    visit_count = next((l for l in lines if "번째 방문" in l), None)
+    receipt = next((l for l in lines if "영수증" in l or "인증" in l), None)
+
+    return {
+        "author": author,
+        "profile": profile,
+        "follow": follow,
+        "visit_info": visit_info,
+        "body": body,
+        "tags": tags,
+        "review_more": any("더보기" in l for l in lines),
+        "extra_review_line": extra_review_line,
+        "visit_date": visit_date,
+        "visit_count": visit_count,
+        "receipt": receipt
+    }
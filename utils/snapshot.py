@@ -0,0 +1,87 @@
+import os
+import json
+import glob
+import hashlib
+from datetime import datetime
+from typing import List, Optional
+import zstandard
+
+from utils.logger import Logger
+logger = Logger()
+
+
+class SnapshotArchive:
+    """
+    크롤링 원본(HTML, 리뷰 텍스트, JSON 응답)을 zstd로 압축해 내용 주소(sha256) 기반으로 저장합니다.
+
+    - objects/<해시 앞 2자리>/<해시>.zst : 원본 데이터 (같은 내용은 한 번만 저장)
+    - manifests/<시각>_<해시>.json       : 가게 단위로 어떤 원본을 수집했는지 기록
+    """
+
+    def __init__(self, root_dir: str, level: int = 10):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.manifests_dir = os.path.join(root_dir, "manifests")
+        self.level = level
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.zst")
+
+    def put(self, data) -> str:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zstandard.ZstdCompressor(level=self.level).compress(data))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+
+    def get_text(self, digest: str) -> str:
+        return self.get(digest).decode("utf-8")
+
+    def save_manifest(self, store_name: str, capture: dict) -> str:
+        """
+        capture 딕셔너리의 원본들을 objects에 저장하고, 해시만 담은 매니페스트 경로를 반환합니다.
+        """
+        captured_at = datetime.now()
+        manifest = {
+            "store_name": store_name,
+            "captured_at": captured_at.isoformat(),
+            "entry_html": self.put(capture["entry_html"]) if capture.get("entry_html") else None,
+            "review_texts": [self.put(t) for t in capture.get("review_texts", [])],
+            "blog_urls": capture.get("blog_urls", []),
+            "blogs": [{"url": b["url"], "html": self.put(b["html"])} for b in capture.get("blogs", [])],
+            "photos": capture.get("photos", []),
+            "responses": [
+                {"url": r["url"], "status": r["status"], "body": self.put(r["body"])}
+                for r in capture.get("responses", [])
+            ]
+        }
+
+        body = json.dumps(manifest, ensure_ascii=False, indent=2)
+        name = f"{captured_at.strftime('%Y%m%d%H%M%S')}_{hashlib.sha256(body.encode('utf-8')).hexdigest()[:12]}.json"
+        path = os.path.join(self.manifests_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(body)
+        logger.info(f"Snapshot Saved: {path}")
+        return path
+
+    def list_manifests(self, store_name: Optional[str] = None) -> List[str]:
+        paths = sorted(glob.glob(os.path.join(self.manifests_dir, "*.json")))
+        if store_name is None:
+            return paths
+        return [p for p in paths if self.load_manifest(p)["store_name"] == store_name]
+
+    def load_manifest(self, path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)